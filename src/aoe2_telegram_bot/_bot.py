@@ -1,29 +1,41 @@
+import asyncio
+import atexit
+import functools
 import logging
+import re
+import threading
 from os import environ
 from typing import Optional
 
 from telegram import Update
-from telegram.ext import ApplicationBuilder
+from telegram.ext import Application, ApplicationBuilder
 
-from ._files import load_cache
+from ._files import compact_file_id_db, init_audio_index, load_cache
 from ._folders import env_file
-from ._handlers import register_handlers
+from ._handlers import register_handlers, warm_file_id_cache
 from .bootstrap import bootstrap
 
 logger = logging.getLogger(__name__)
 
+# Matches `TGB_TOKEN=xxx`, optionally quoted and prefixed with `export`
+_TOKEN_RE = re.compile(
+    r"^[ \t]*(?:export[ \t]+)?TGB_TOKEN[ \t]*=[ \t]*[\"']?([^\"'\n]+)", re.MULTILINE
+)
 
+
+@functools.lru_cache(maxsize=1)
 def get_token_from_env_file() -> Optional[str]:
-    """Read TGB_TOKEN from an environment file."""
-    if not env_file.is_file():
-        return None
+    """Read TGB_TOKEN from an environment file.
 
-    for line in env_file.read_text().splitlines():
-        line = line.strip()
-        if line.startswith("TGB_TOKEN="):
-            return line.split("=", 1)[1].strip()
+    The result is cached, call get_token_from_env_file.cache_clear() to re-read it.
+    """
+    try:
+        content = env_file.read_text()
+    except (FileNotFoundError, IsADirectoryError):
+        return None
 
-    return None
+    match = _TOKEN_RE.search(content)
+    return match.group(1).strip() if match else None
 
 
 def get_token() -> str:
@@ -44,6 +56,40 @@ def get_token() -> str:
     return token
 
 
+def get_warmup_chat_id() -> Optional[int]:
+    """Read the optional TGB_WARMUP_CHAT_ID environment variable."""
+    chat_id = environ.get("TGB_WARMUP_CHAT_ID")
+    if not chat_id:
+        return None
+
+    try:
+        return int(chat_id)
+    except ValueError:
+        error = f"TGB_WARMUP_CHAT_ID must be a numeric chat ID, got {chat_id!r}"
+        logger.error(error)
+        raise EnvironmentError(error) from None
+
+
+async def warm_up(application: Application, chat_id: int) -> None:
+    """Upload uncached audio files to chat_id in the background while polling."""
+    application.bot_data["warm_up_task"] = asyncio.create_task(
+        warm_file_id_cache(application.bot, chat_id), name="warm_file_id_cache"
+    )
+
+
+async def stop_warm_up(application: Application) -> None:
+    """Cancel the warm up if it is still running when the application stops."""
+    task = application.bot_data.pop("warm_up_task", None)
+    if task is None:
+        return
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        logger.info("File ID cache warm up cancelled")
+
+
 def main() -> None:
     """Entry point for aoe2-telegram-bot command."""
     # Configure logging only if not already configured
@@ -61,8 +107,21 @@ def main() -> None:
 
     logger.info("Loading file ID cache...")
     load_cache()
-
-    application = ApplicationBuilder().token(get_token()).build()
+    atexit.register(compact_file_id_db)
+
+    # Index audio files while the application is being built
+    logger.info("Indexing audio files...")
+    indexer = threading.Thread(target=init_audio_index, daemon=True)
+    indexer.start()
+
+    warmup_chat_id = get_warmup_chat_id()
+    builder = ApplicationBuilder().token(get_token())
+    if warmup_chat_id is not None:
+        builder = builder.post_init(
+            functools.partial(warm_up, chat_id=warmup_chat_id)
+        ).post_stop(stop_warm_up)
+    application = builder.build()
+    indexer.join()
     register_handlers(application)
     logger.info("Starting polling...")
     application.run_polling(allowed_updates=Update.MESSAGE)
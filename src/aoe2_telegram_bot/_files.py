@@ -2,51 +2,211 @@
 Manage files, find them or return a random file with a specific pattern.
 Handles telegram files ID in a cache so we do not have to re-upload the same file
 again and again to telegram servers. Stores file IDs in a dict in memory and persists
-it to a JSON file stored in the user's config folder.
+it to a JSON Lines file stored in the user's config folder: each new file ID is
+appended as one line and the file is compacted back to a single line on exit.
 """
 
 import json
 import logging
+import os
 from pathlib import Path
-from random import choice
-from typing import Optional, Tuple
+from random import Random
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 
 from ._folders import audio_folder, files_id_db
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 _files_id_cache: dict[str, str] = {}
-civilizations_pattern = "[A-Z][a-z]*.mp3"
-taunts_pattern = "[0-9][0-9] *.mp3"
-audio_pattern = "*.wav"
+# Read-only view of the cache, updates must go through set_file_id
+_files_id_view = MappingProxyType(_files_id_cache)
+
+# Audio file names indexed once at startup, the audio folder does not change at
+# runtime. Path objects are only built for the files actually sent. All indexed
+# names end with ".wav" or ".mp3", so stems are sliced with name[:-4].
+_audio_categories = ("audio", "taunts", "civs")
+_audio_index: dict[str, tuple[str, ...]] = {}
+_audio_stems: dict[str, tuple[str, ...]] = {}
+_taunt_by_num: dict[int, str] = {}
+_civ_by_lower: dict[str, str] = {}
+_sound_by_lower: dict[str, str] = {}
+_list_texts: dict[str, str] = {}
+
+# Dedicated generator for random audio picks
+_choice = Random().choice
+
+
+def _scan_audio_folder() -> list[str]:
+    """Return the sorted names of the files in the audio folder."""
+    try:
+        with os.scandir(audio_folder) as entries:
+            return sorted(entry.name for entry in entries if entry.is_file())
+    except FileNotFoundError:
+        logger.warning(f"Audio folder {audio_folder} not found")
+        return []
+
+
+def _audio_category(name: str) -> Optional[str]:
+    """Return the audio index category of a file name, or None if it is not audio.
+
+    - sounds: "*.wav"
+    - taunts: two digits, a space and a name, e.g. "01 yes.mp3"
+    - civilizations: a single capitalized word, e.g. "Britons.mp3"
+    """
+    if name.endswith(".wav"):
+        return "audio"
+    if not name.endswith(".mp3"):
+        return None
+
+    stem = name[:-4]
+    if stem[:2].isascii() and stem[:2].isdigit() and stem[2:3] == " ":
+        return "taunts"
+    if (
+        stem.isascii()
+        and stem.isalpha()
+        and stem[0].isupper()
+        and (len(stem) == 1 or stem[1:].islower())
+    ):
+        return "civs"
+    return None
+
+
+def init_audio_index() -> None:
+    """Scan the audio folder once and index files by category. Called at startup."""
+    _audio_index.clear()
+    _audio_stems.clear()
+    _taunt_by_num.clear()
+    _civ_by_lower.clear()
+    _sound_by_lower.clear()
+    _list_texts.clear()
+    found: dict[str, list[str]] = {category: [] for category in _audio_categories}
+    for name in _scan_audio_folder():
+        category = _audio_category(name)
+        if category is not None:
+            found[category].append(name)
+
+    # Stored as tuples so callers share them without copies
+    for category, names in found.items():
+        _audio_index[category] = tuple(names)
+        _audio_stems[category] = tuple(name[:-4] for name in names)
+
+    for name in _audio_index["taunts"]:
+        # "01 start the game.mp3" -> 1
+        _taunt_by_num[int(name[:2])] = name
+    for name in _audio_index["civs"]:
+        _civ_by_lower[name[:-4].lower()] = name
+    for name in _audio_index["audio"]:
+        _sound_by_lower[name[:-4].lower()] = name
+
+    _build_list_texts()
+
+    logger.info(
+        f"Indexed {len(_audio_index['audio'])} sounds, "
+        f"{len(_audio_index['taunts'])} taunts and "
+        f"{len(_audio_index['civs'])} civilizations"
+    )
+
+
+def clear_audio_index() -> None:
+    """Clear the audio index, it is rebuilt on next use."""
+    _audio_index.clear()
+
+
+def _ensure_audio_index() -> None:
+    """Build the audio index on first use if init_audio_index was not called."""
+    if not _audio_index:
+        init_audio_index()
+
+
+def _to_path(name: Optional[str]) -> Optional[Path]:
+    return None if name is None else audio_folder / name
+
+
+def _get_stems(category: str) -> tuple[str, ...]:
+    _ensure_audio_index()
+    return _audio_stems.get(category, ())
+
+
+def _build_list_texts() -> None:
+    """Format the /civilizations, /taunts and /sounds replies once."""
+    civ_list = "\n".join(f"/{civ}" for civ in _get_stems("civs"))
+    _list_texts["civs"] = f"Available civilizations:\n{civ_list}"
+
+    taunts = _get_stems("taunts")
+    if taunts:
+        # "01 start the game" -> "/01: start the game"
+        taunt_list = "\n".join(f"/{t[:2]}: {t[3:]}" for t in taunts)
+        _list_texts["taunts"] = f"Available taunts:\n{taunt_list}"
+    else:
+        _list_texts["taunts"] = "No taunts available."
+
+    sounds = _get_stems("audio")
+    if sounds:
+        sound_list = "\n".join(f"/{sound}" for sound in sounds)
+        _list_texts["audio"] = f"Available sounds ({len(sounds)}):\n{sound_list}"
+    else:
+        _list_texts["audio"] = "No sounds available."
+
+
+def get_list_text(category: str) -> str:
+    """Return the preformatted list reply for an audio index category."""
+    _ensure_audio_index()
+    return _list_texts.get(category, "")
+
 
+def get_sound_list() -> tuple[str, ...]:
+    return _get_stems("audio")
 
-def get_sound_files() -> list[Path]:
-    return list(audio_folder.glob(audio_pattern))
 
+def get_sound_by_name(name: str) -> Optional[Path]:
+    """Return the sound file for a case-insensitive name, or None."""
+    _ensure_audio_index()
+    return _to_path(_sound_by_lower.get(name.lower()))
 
-def get_sound_list() -> list[str]:
-    return [str(sound.stem) for sound in get_sound_files()]
 
+def get_civilization_list() -> tuple[str, ...]:
+    return _get_stems("civs")
 
-def get_civilization_files() -> list[Path]:
-    return list(audio_folder.glob(civilizations_pattern))
 
+def get_civilization_by_name(name: str) -> Optional[Path]:
+    """Return the civilization file for a case-insensitive name, or None."""
+    _ensure_audio_index()
+    return _to_path(_civ_by_lower.get(name.lower()))
 
-def get_civilization_list() -> list[str]:
-    return [str(civ.stem) for civ in get_civilization_files()]
 
+def get_audio_files() -> list[Path]:
+    """Return the paths of all indexed audio files."""
+    _ensure_audio_index()
+    return [audio_folder / name for names in _audio_index.values() for name in names]
 
-def get_taunt_list() -> list[str]:
-    return [str(taunt.stem) for taunt in list(audio_folder.glob(taunts_pattern))]
 
+def get_taunt_list() -> tuple[str, ...]:
+    return _get_stems("taunts")
 
-def _get_random_file(pattern: str) -> Tuple[Optional[Path], Optional[str]]:
-    """Get a random file matching the pattern, checking cache first.
+
+def get_taunt_numbers() -> list[int]:
+    """Return the sorted numbers of the available taunts."""
+    _ensure_audio_index()
+    return sorted(_taunt_by_num)
+
+
+def get_taunt_by_number(num: int) -> Optional[Path]:
+    """Return the taunt file for a taunt number, or None."""
+    _ensure_audio_index()
+    return _to_path(_taunt_by_num.get(num))
+
+
+def _get_random_file(category: str) -> Tuple[Optional[Path], Optional[str]]:
+    """Get a random file of the given category from the audio index.
 
     Args:
-        pattern: Glob pattern to match files (e.g., "*.wav", "[0-9][0-9] *.mp3")
-        category: Category name for logging (e.g., "audio", "taunt", "civilization")
+        category: Audio index category ("audio", "taunts" or "civs")
 
     Returns:
         (file_path, file_id) tuple where one of them will be None:
@@ -54,14 +214,15 @@ def _get_random_file(pattern: str) -> Tuple[Optional[Path], Optional[str]]:
         - If new file: (file_path, None)
         - If no files: (None, None)
     """
-    logger.debug(f"Getting random file with {pattern}")
+    logger.debug(f"Getting random file from {category}")
 
-    files = list(audio_folder.glob(pattern))
-    if not files:
+    _ensure_audio_index()
+    names = _audio_index.get(category)
+    if not names:
         logger.warning("No files found")
         return None, None
 
-    selected = choice(files)
+    selected = audio_folder / _choice(names)
     logger.debug(f"Selected {selected}")
 
     # search in cache _files_id_cache if the file is present
@@ -72,31 +233,77 @@ def _get_random_file(pattern: str) -> Tuple[Optional[Path], Optional[str]]:
 def get_random_audio() -> Tuple[Optional[Path], Optional[str]]:
     """Return a random AoE2 sound file."""
     logger.debug("Getting random sound")
-    return _get_random_file(audio_pattern)
+    return _get_random_file("audio")
 
 
 def get_random_taunt() -> Tuple[Optional[Path], Optional[str]]:
     """Return a random AoE2 taunt audio file."""
     logger.debug("Getting random taunt")
-    return _get_random_file(taunts_pattern)
+    return _get_random_file("taunts")
 
 
 def get_random_civilization() -> Tuple[Optional[Path], Optional[str]]:
     """Return a random AoE2 civilization audio file."""
     logger.debug("Getting random civilization audio")
-    return _get_random_file(civilizations_pattern)
+    return _get_random_file("civs")
 
 
-def load_cache() -> None:
-    """Load cache from file if not already loaded. Called at startup."""
-    if _files_id_cache or not files_id_db.exists():
+def _json_dumps(obj: dict[str, str]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _migrate_legacy_file_id_db() -> None:
+    """Import the file IDs of the former single JSON document database."""
+    legacy_db = files_id_db.with_suffix(".json")
+    if not legacy_db.exists():
         return
 
     try:
-        with files_id_db.open("r") as f:
+        with legacy_db.open("rb") as f:
             _files_id_cache.update(json.load(f))
-    except (json.JSONDecodeError, ValueError):
-        pass  # Corrupted or empty file, start fresh
+    except (json.JSONDecodeError, TypeError, ValueError):
+        logger.warning(f"Ignoring corrupted legacy file ID database {legacy_db}")
+        return
+
+    logger.info(f"Migrated {len(_files_id_cache)} file IDs from {legacy_db}")
+    compact_file_id_db()
+
+
+def load_cache() -> None:
+    """Load cache from file if not already loaded. Called at startup."""
+    if _files_id_cache:
+        return
+    if not files_id_db.exists():
+        _migrate_legacy_file_id_db()
+        return
+
+    lines = 0
+    damaged = False
+    with files_id_db.open("rb") as f:
+        for line in f:
+            lines += 1
+            # An unterminated last line would swallow the next appended entry
+            if not line.endswith(b"\n"):
+                damaged = True
+            try:
+                # Later entries override earlier ones
+                _files_id_cache.update(_json_loads(line))
+            except (json.JSONDecodeError, TypeError, ValueError):
+                damaged = True  # Corrupted or interrupted line, skip it
+
+    if lines > 1 or damaged:
+        if _files_id_cache:
+            compact_file_id_db()
+        else:
+            os.truncate(files_id_db, 0)
 
 
 def get_file_id(file_path: Path) -> Optional[str]:
@@ -107,18 +314,34 @@ def get_file_id(file_path: Path) -> Optional[str]:
 def set_file_id(file_path: Path, file_id: str) -> None:
     """Set the telegram file ID for a given file path."""
     _files_id_cache[file_path.name] = file_id
-    # Write entire cache to file
+    # Only append the new entry, the whole cache is written by compact_file_id_db
     files_id_db.parent.mkdir(parents=True, exist_ok=True)
-    with files_id_db.open("w") as f:
-        json.dump(_files_id_cache, f, indent=2)
+    with files_id_db.open("ab") as f:
+        f.write(_json_dumps({file_path.name: file_id}) + b"\n")
+
+
+def compact_file_id_db() -> None:
+    """Rewrite the file ID database as a single line. Called at startup and exit."""
+    if not _files_id_cache:
+        return
+
+    files_id_db.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = files_id_db.with_suffix(".tmp")
+    with tmp_file.open("wb") as f:
+        f.write(_json_dumps(_files_id_cache) + b"\n")
+    tmp_file.replace(files_id_db)
 
 
 def clear_file_id_db() -> None:
     """Clear the file ID database."""
     _files_id_cache.clear()
-    files_id_db.unlink(missing_ok=True)
+    # Truncate in place rather than unlink so the file keeps its inode
+    try:
+        os.truncate(files_id_db, 0)
+    except FileNotFoundError:
+        pass
 
 
-def get_all_file_ids() -> dict[str, str]:
-    """Get all file IDs in the database."""
-    return _files_id_cache.copy()
+def get_all_file_ids() -> Mapping[str, str]:
+    """Get a read-only view of all file IDs in the database."""
+    return _files_id_view
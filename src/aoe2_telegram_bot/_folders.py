@@ -19,4 +19,4 @@ service_file = current_module_folder / "distro" / "aoe2-telegram-bot.service"
 
 config_folder = Path.home() / ".config/aoe2-telegram-bot"
 env_file = config_folder / "env"
-files_id_db = config_folder / "files_id_db.json"
+files_id_db = config_folder / "files_id_db.jsonl"
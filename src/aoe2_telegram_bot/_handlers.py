@@ -1,11 +1,15 @@
 """Handler functions for Telegram bot commands."""
 
+import asyncio
 import logging
+import warnings
+from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Final, Optional
 
-from telegram import Update
+from telegram import Bot, Update
 from telegram.constants import ChatAction
+from telegram.error import RetryAfter, TelegramError
 from telegram.ext import (
     ApplicationBuilder,
     CommandHandler,
@@ -13,41 +17,40 @@ from telegram.ext import (
     MessageHandler,
     filters,
 )
+from telegram.warnings import PTBDeprecationWarning
 
 from ._files import (
-    get_civilization_files,
+    get_audio_files,
+    get_civilization_by_name,
     get_civilization_list,
     get_file_id,
+    get_list_text,
     get_random_audio,
     get_random_civilization,
     get_random_taunt,
-    get_sound_files,
+    get_sound_by_name,
     get_sound_list,
-    get_taunt_list,
+    get_taunt_by_number,
+    get_taunt_numbers,
     set_file_id,
 )
-from ._folders import audio_caption, audio_folder
+from ._folders import audio_caption
 
 logger = logging.getLogger(__name__)
 
+_RECORD_VOICE = ChatAction.RECORD_VOICE
+_AUDIO_CAPTION = audio_caption
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text=(
-            "🏰 *Bienvenue sur le bot Sound Box Age of Empires II!* ⚔️\n\n"
-            "utilisez /aide pour la liste des commandes.\n"
-            "use /help for the list of commands.\n\n"
-            "Vous pouvez aussi utiliser /start pour revenir à ce message."
-            "You can also use /start to return here."
-        ),
-        parse_mode="Markdown",
-    )
 
+_START_TEXT: Final[str] = (
+    "🏰 *Bienvenue sur le bot Sound Box Age of Empires II!* ⚔️\n\n"
+    "utilisez /aide pour la liste des commandes.\n"
+    "use /help for the list of commands.\n\n"
+    "Vous pouvez aussi utiliser /start pour revenir à ce message."
+    "You can also use /start to return here."
+)
 
-async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Display help message with available commands in english"""
-    en = """
+_HELP_TEXT: Final[str] = """
 🏰 *Age of Empires II Bot* 🎮
 
 *Random Audio Commands:*
@@ -73,14 +76,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 à la bataille! ⚔️
 """
 
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id, text=en, parse_mode="Markdown"
-    )
-
-
-async def help_command_french(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Display help message with available commands in french"""
-    fr = """
+_HELP_TEXT_FRENCH: Final[str] = """
 🏰 *Bot Age of Empires II* 🎮
 
 *Commandes audio aléatoires :*
@@ -104,9 +100,35 @@ async def help_command_french(update: Update, context: ContextTypes.DEFAULT_TYPE
 à la bataille ! ⚔️
 """
 
-    logger.warning(f"sending french help message: {fr[600:610]}")
+
+def _command_name(update: Update) -> str:
+    """Return the command of a message without "/", bot name and arguments.
+
+    "/11@aoe2_bot some text" -> "11"
+    """
+    command = update.message.text.split(maxsplit=1)[0]
+    return command[1:].partition("@")[0]
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id, text=_START_TEXT, parse_mode="Markdown"
+    )
+
+
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Display help message with available commands in english"""
     await context.bot.send_message(
-        chat_id=update.effective_chat.id, text=fr, parse_mode="Markdown"
+        chat_id=update.effective_chat.id, text=_HELP_TEXT, parse_mode="Markdown"
+    )
+
+
+async def help_command_french(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Display help message with available commands in french"""
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text=_HELP_TEXT_FRENCH,
+        parse_mode="Markdown",
     )
 
 
@@ -133,28 +155,27 @@ async def send_audio(
         audio_file: Path to audio file (if uploading new file)
         file_id: Telegram file_id (if using cached file)
     """
+    chat_id = update.effective_chat.id
+
     # Handle case where both are None
     if audio_file is None and file_id is None:
         logger.error("No audio file or file_id provided")
         await context.bot.send_message(
-            chat_id=update.effective_chat.id,
+            chat_id=chat_id,
             text="Sorry, no audio files available.",
         )
         return
 
-    await context.bot.send_chat_action(
-        chat_id=update.effective_chat.id,
-        action=ChatAction.RECORD_VOICE,
-    )
-
     audio_to_send = file_id
     title = None
+    was_cached = file_id is not None
 
     if file_id:
         logger.debug(f"Using cached file_id: {file_id}")
     elif audio_file:
         # Check if we have a cached file_id for this file
         cached_file_id = get_file_id(audio_file)
+        was_cached = cached_file_id is not None
         if cached_file_id:
             logger.debug(
                 f"Using cached file_id for {audio_file.name}: {cached_file_id}"
@@ -168,16 +189,26 @@ async def send_audio(
         logger.error("audio_file is None but no file_id provided")
         return
 
+    # Only show the recording status while uploading, cached file IDs are sent instantly
+    if isinstance(audio_to_send, Path):
+        try:
+            await context.bot.send_chat_action(
+                chat_id=chat_id,
+                action=_RECORD_VOICE,
+            )
+        except TelegramError as error:
+            logger.warning(f"Failed to send chat action: {error}")
+
     message = await context.bot.send_audio(
-        chat_id=update.effective_chat.id,
+        chat_id=chat_id,
         audio=audio_to_send,
         title=title,
-        thumbnail=audio_caption,
+        thumbnail=_AUDIO_CAPTION,
         disable_notification=True,
     )
 
     # Cache new file_id if we just uploaded
-    if audio_file and not file_id and not get_file_id(audio_file):
+    if audio_file and not was_cached:
         new_file_id = message.audio.file_id
         set_file_id(audio_file, new_file_id)
         logger.debug(f"Cached new file_id for {audio_file.name}: {new_file_id}")
@@ -185,35 +216,79 @@ async def send_audio(
     logger.info(f"Audio sent: {title or 'cached file'}")
 
 
-async def _send_random_audio(
-    update: Update,
-    context: ContextTypes.DEFAULT_TYPE,
-    get_file_func,
-):
-    """Helper to send a random audio file using the provided getter function."""
-    audio_file, file_id = get_file_func()
-    await send_audio(update, context, audio_file, file_id)
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """Return the flood control delay, retry_after is an int or a timedelta."""
+    with warnings.catch_warnings():
+        # PTB >= 22.2 warns when reading an int, it will always be a timedelta later
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        delay = error.retry_after
+    if isinstance(delay, timedelta):
+        return delay.total_seconds()
+    return delay
+
+
+async def warm_file_id_cache(bot: Bot, chat_id: int) -> None:
+    """Upload every audio file without a cached file_id to a chat once.
+
+    Replies can then always reuse a telegram file_id instead of uploading the file
+    on the first request.
+
+    Args:
+        bot: Telegram bot
+        chat_id: Chat receiving the uploads (e.g. a private admin chat)
+    """
+    audio_files = [file for file in get_audio_files() if get_file_id(file) is None]
+    logger.info(f"Uploading {len(audio_files)} audio files to warm the cache")
 
+    for audio_file in audio_files:
+        while True:
+            try:
+                message = await bot.send_audio(
+                    chat_id=chat_id,
+                    audio=audio_file,
+                    title=audio_file.stem,
+                    thumbnail=_AUDIO_CAPTION,
+                    disable_notification=True,
+                )
+            except RetryAfter as error:
+                # Flood control, wait as long as telegram asks and retry the same file
+                delay = _retry_after_seconds(error)
+                logger.info(f"Flood control, retrying {audio_file.name} in {delay}s")
+                await asyncio.sleep(delay)
+                continue
+            except TelegramError as error:
+                logger.warning(f"Failed to upload {audio_file.name}: {error}")
+                message = None
+            break
 
-async def send_random_sound(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await _send_random_audio(update, context, get_random_audio)
+        if message is not None:
+            set_file_id(audio_file, message.audio.file_id)
 
+    logger.info("File ID cache warm up complete")
 
-async def send_random_civilization(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await _send_random_audio(update, context, get_random_civilization)
 
+def _random_audio_handler(get_file_func):
+    """Build a handler sending a random audio file from the provided getter function."""
 
-async def send_random_taunt(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await _send_random_audio(update, context, get_random_taunt)
+    async def send_random_audio(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        audio_file, file_id = get_file_func()
+        await send_audio(update, context, audio_file, file_id)
+
+    return send_random_audio
+
+
+send_random_sound = _random_audio_handler(get_random_audio)
+send_random_civilization = _random_audio_handler(get_random_civilization)
+send_random_taunt = _random_audio_handler(get_random_taunt)
 
 
 async def taunt(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logger.debug("searching for corresponding taunt")
-    taunt_num = update.message.text.strip("/").zfill(2)
-    taunt_file = list(audio_folder.glob(f"{taunt_num} *.mp3"))
+    taunt_num = _command_name(update)
+    taunt_file = get_taunt_by_number(int(taunt_num)) if taunt_num.isdecimal() else None
     logger.debug(f"Taunt {taunt_num} found: {taunt_file}")
 
-    if not taunt_file:
+    if taunt_file is None:
         logger.debug(f"Taunt {taunt_num} not found")
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
@@ -221,20 +296,16 @@ async def taunt(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    taunt = taunt_file[0]
-    logger.debug(f"Sending taunt {taunt}")
-    await send_audio(update, context, taunt)
+    logger.debug(f"Sending taunt {taunt_file}")
+    await send_audio(update, context, taunt_file)
 
 
 async def civilization(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    civ_name = update.message.text.strip("/")
-    # Try case-insensitive search by checking all files
-    civ_file = [
-        civ for civ in get_civilization_files() if civ.stem.lower() == civ_name.lower()
-    ]
+    civ_name = _command_name(update)
+    civ_file = get_civilization_by_name(civ_name)
     logger.debug(f"Civilization {civ_name} found: {civ_file}")
 
-    if not civ_file:
+    if civ_file is None:
         logger.debug(f"Civilization {civ_name} not found")
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
@@ -242,20 +313,16 @@ async def civilization(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    civ = civ_file[0]
-    logger.debug(f"Sending civilization {civ}")
-    await send_audio(update, context, civ)
+    logger.debug(f"Sending civilization {civ_file}")
+    await send_audio(update, context, civ_file)
 
 
 async def sound(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    sound_name = update.message.text.strip("/")
-    # Try case-insensitive search by checking all files
-    sound_file = [
-        sound for sound in get_sound_files() if sound.stem.lower() == sound_name.lower()
-    ]
+    sound_name = _command_name(update)
+    sound_file = get_sound_by_name(sound_name)
     logger.debug(f"Sound {sound_name} found: {sound_file}")
 
-    if not sound_file:
+    if sound_file is None:
         logger.debug(f"Sound {sound_name} not found")
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
@@ -263,112 +330,74 @@ async def sound(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    sound = sound_file[0]
-    logger.debug(f"Sending sound {sound}")
-    await send_audio(update, context, sound)
+    logger.debug(f"Sending sound {sound_file}")
+    await send_audio(update, context, sound_file)
 
 
 async def list_civilizations(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    civ_list = "\n".join(f"/{civ}" for civ in get_civilization_list())
     await context.bot.send_message(
         chat_id=update.effective_chat.id,
-        text=f"Available civilizations:\n{civ_list}",
+        text=get_list_text("civs"),
     )
 
 
 async def list_taunts(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all available taunts."""
-    taunts = get_taunt_list()
-    if not taunts:
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id,
-            text="No taunts available.",
-        )
-        return
-
-    # Format as numbered list with command
-    taunt_list = "\n".join(
-        f"/{t.split()[0]}: {' '.join(t.split()[1:])}"
-        for t in taunts
-        if t.split()[0].isdigit()
-    )
     await context.bot.send_message(
         chat_id=update.effective_chat.id,
-        text=f"Available taunts:\n{taunt_list}",
+        text=get_list_text("taunts"),
     )
 
 
 async def list_sounds(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all available sound files."""
-    sounds = get_sound_list()
-    if not sounds:
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id,
-            text="No sounds available.",
-        )
-        return
-
-    sound_list = "\n".join(f"/{sound}" for sound in sounds)
-
     await context.bot.send_message(
         chat_id=update.effective_chat.id,
-        text=f"Available sounds ({len(sounds)}):\n{sound_list}",
+        text=get_list_text("audio"),
     )
 
 
 def register_taunt_handlers(application: ApplicationBuilder):
     """Register handlers for all taunt numbers dynamically based on available files."""
-    taunt_numbers = set()
-    for taunt_file in get_taunt_list():
-        # Extract number from filename (e.g., "01 start the game.mp3" -> "1")
-        parts = taunt_file.split()
-        if parts and parts[0].isdigit():
-            taunt_numbers.add(int(parts[0]))
-
-    for taunt_num in sorted(taunt_numbers):
-        application.add_handler(CommandHandler(str(taunt_num), taunt))
+    taunt_commands = [str(taunt_num) for taunt_num in get_taunt_numbers()]
+    if taunt_commands:
+        application.add_handler(CommandHandler(taunt_commands, taunt))
 
 
 def register_civilization_handlers(application: ApplicationBuilder):
     """Register handlers for all civilizations dynamically."""
-    for civ_name in get_civilization_list():
-        # Register with lowercase to allow commands without capitals
-        application.add_handler(CommandHandler(civ_name, civilization))
-        application.add_handler(CommandHandler(civ_name.lower(), civilization))
+    # Commands are case insensitive, so /Britons and /britons share the handler
+    civ_commands = list(get_civilization_list())
+    if civ_commands:
+        application.add_handler(CommandHandler(civ_commands, civilization))
 
 
 def register_sounds_handlers(application: ApplicationBuilder):
     """Register handlers for all sound files dynamically."""
-    for sound_name in get_sound_list():
-        # Register with lowercase to allow commands without capitals
-        application.add_handler(CommandHandler(sound_name, sound))
-        application.add_handler(CommandHandler(sound_name.lower(), sound))
+    sound_commands = list(get_sound_list())
+    if sound_commands:
+        application.add_handler(CommandHandler(sound_commands, sound))
 
 
 def register_handlers(application: ApplicationBuilder):
-    """Register all bot handlers."""
+    """Register all bot handlers from the audio index built by init_audio_index."""
     logger.debug("Registering handlers")
 
+    # One handler per function with all its aliases
     handlers = {
-        "start": start,
-        "help": help_command,
-        "aide": help_command_french,
-        "sound": send_random_sound,
-        "bruitage": send_random_sound,
-        "civilization": send_random_civilization,
-        "civilisation": send_random_civilization,
-        "taunt": send_random_taunt,
-        "provocation": send_random_taunt,
-        "sounds": list_sounds,
-        "bruits": list_sounds,
-        "civilizations": list_civilizations,
-        "civilisations": list_civilizations,
-        "taunts": list_taunts,
-        "provocations": list_taunts,
+        start: ["start"],
+        help_command: ["help"],
+        help_command_french: ["aide"],
+        send_random_sound: ["sound", "bruitage"],
+        send_random_civilization: ["civilization", "civilisation"],
+        send_random_taunt: ["taunt", "provocation"],
+        list_sounds: ["sounds", "bruits"],
+        list_civilizations: ["civilizations", "civilisations"],
+        list_taunts: ["taunts", "provocations"],
     }
 
-    for command, function in handlers.items():
-        application.add_handler(CommandHandler(command, function))
+    for function, commands in handlers.items():
+        application.add_handler(CommandHandler(commands, function))
 
     register_taunt_handlers(application)
     register_civilization_handlers(application)
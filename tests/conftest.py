@@ -8,7 +8,17 @@ from aoe2_telegram_bot._files import clear_file_id_db
 
 
 @pytest.fixture(autouse=True)
-def clean_cache():
+def isolated_files_id_db(tmp_path, monkeypatch):
+    """Point the file ID database at a temporary file instead of the user config."""
+    from aoe2_telegram_bot import _files
+
+    db_file = tmp_path / "files_id_db.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", db_file)
+    return db_file
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(isolated_files_id_db):
     """Clean file ID cache before and after each test."""
     clear_file_id_db()
     yield
@@ -35,15 +45,35 @@ def temp_audio_folder(tmp_path, monkeypatch):
     (audio_dir / "Britons.mp3").write_text("britons")
     (audio_dir / "Celts.mp3").write_text("celts")
 
-    # Patch audio_folder in _folders, _handlers and _files modules so all
-    # places that cached the value at import time use the temporary folder.
-    from aoe2_telegram_bot import _files, _folders, _handlers
+    # Patch audio_folder in _folders and _files modules so all places that
+    # cached the value at import time use the temporary folder, and drop the
+    # audio index so it is rebuilt from it.
+    from aoe2_telegram_bot import _files, _folders
 
     monkeypatch.setattr(_folders, "audio_folder", audio_dir)
-    monkeypatch.setattr(_handlers, "audio_folder", audio_dir)
     monkeypatch.setattr(_files, "audio_folder", audio_dir)
+    _files.clear_audio_index()
+
+    yield audio_dir
+
+    _files.clear_audio_index()
+
+
+@pytest.fixture
+def empty_audio_folder(tmp_path, monkeypatch):
+    """Create an empty temporary audio folder and index it."""
+    audio_dir = tmp_path / "empty"
+    audio_dir.mkdir()
+
+    from aoe2_telegram_bot import _files, _folders
+
+    monkeypatch.setattr(_folders, "audio_folder", audio_dir)
+    monkeypatch.setattr(_files, "audio_folder", audio_dir)
+    _files.init_audio_index()
+
+    yield audio_dir
 
-    return audio_dir
+    _files.clear_audio_index()
 
 
 @pytest.fixture
@@ -0,0 +1,183 @@
+"""Tests for bot token configuration."""
+
+import pytest
+
+from aoe2_telegram_bot._bot import (
+    get_token,
+    get_token_from_env_file,
+    get_warmup_chat_id,
+)
+
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """Point the bot at a temporary environment file."""
+    from aoe2_telegram_bot import _bot
+
+    env_file = tmp_path / "env"
+    monkeypatch.setattr(_bot, "env_file", env_file)
+    monkeypatch.delenv("TGB_TOKEN", raising=False)
+    get_token_from_env_file.cache_clear()
+    yield env_file
+    get_token_from_env_file.cache_clear()
+
+
+def test_token_from_env_file(env_file):
+    """Test reading the token from the environment file."""
+    env_file.write_text("LOG_LEVEL=DEBUG\nTGB_TOKEN=abc:123\n")
+
+    assert get_token_from_env_file() == "abc:123"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "export TGB_TOKEN=abc:123\n",
+        'TGB_TOKEN="abc:123"\n',
+        "TGB_TOKEN = 'abc:123'\n",
+        "# TGB_TOKEN=commented\nTGB_TOKEN=abc:123\n",
+    ],
+)
+def test_token_from_env_file_formats(env_file, content):
+    """Test quoted, exported and commented token lines."""
+    env_file.write_text(content)
+
+    assert get_token_from_env_file() == "abc:123"
+
+
+def test_token_from_env_file_is_cached(env_file):
+    """Test the environment file is only read once until the cache is cleared."""
+    env_file.write_text("TGB_TOKEN=first\n")
+    assert get_token_from_env_file() == "first"
+
+    env_file.write_text("TGB_TOKEN=second\n")
+    assert get_token_from_env_file() == "first"
+
+    get_token_from_env_file.cache_clear()
+    assert get_token_from_env_file() == "second"
+
+
+def test_token_from_env_file_missing(env_file):
+    """Test a missing environment file."""
+    assert get_token_from_env_file() is None
+
+
+def test_token_from_env_file_is_directory(env_file):
+    """Test an environment file path that is a directory."""
+    env_file.mkdir()
+
+    assert get_token_from_env_file() is None
+
+
+def test_token_from_env_file_without_token(env_file):
+    """Test an environment file without TGB_TOKEN."""
+    env_file.write_text("LOG_LEVEL=DEBUG\nTGB_TOKEN=\nOTHER=value\n")
+
+    assert get_token_from_env_file() is None
+
+
+def test_token_environment_variable_first(env_file, monkeypatch):
+    """Test the environment variable takes precedence over the file."""
+    env_file.write_text("TGB_TOKEN=from_file\n")
+    monkeypatch.setenv("TGB_TOKEN", "from_env")
+
+    assert get_token() == "from_env"
+
+
+def test_token_not_found(env_file):
+    """Test an error is raised when no token is configured."""
+    with pytest.raises(EnvironmentError):
+        get_token()
+
+
+def test_warmup_chat_id(monkeypatch):
+    """Test parsing the warm up chat ID."""
+    monkeypatch.setenv("TGB_WARMUP_CHAT_ID", "-100123")
+
+    assert get_warmup_chat_id() == -100123
+
+
+def test_warmup_chat_id_unset(monkeypatch):
+    """Test the warm up is disabled without TGB_WARMUP_CHAT_ID."""
+    monkeypatch.delenv("TGB_WARMUP_CHAT_ID", raising=False)
+
+    assert get_warmup_chat_id() is None
+
+
+def test_warmup_chat_id_invalid(monkeypatch):
+    """Test a non numeric warm up chat ID is rejected at startup."""
+    monkeypatch.setenv("TGB_WARMUP_CHAT_ID", "@my_channel")
+
+    with pytest.raises(EnvironmentError, match="TGB_WARMUP_CHAT_ID"):
+        get_warmup_chat_id()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_in_background(monkeypatch):
+    """Test the warm up is started as a task and cancelled when the bot stops."""
+    import asyncio
+    from unittest.mock import MagicMock
+
+    from aoe2_telegram_bot import _bot
+
+    started = asyncio.Event()
+
+    async def fake_warm_file_id_cache(bot, chat_id):
+        started.set()
+        await asyncio.Event().wait()  # Never completes on its own
+
+    monkeypatch.setattr(_bot, "warm_file_id_cache", fake_warm_file_id_cache)
+    application = MagicMock(bot_data={})
+
+    await _bot.warm_up(application, chat_id=42)
+    task = application.bot_data["warm_up_task"]
+    await started.wait()
+    assert not task.done()
+
+    await _bot.stop_warm_up(application)
+    assert task.cancelled()
+    assert "warm_up_task" not in application.bot_data
+
+
+@pytest.mark.asyncio
+async def test_stop_warm_up_without_task():
+    """Test stopping the bot when no warm up was started."""
+    from unittest.mock import MagicMock
+
+    from aoe2_telegram_bot._bot import stop_warm_up
+
+    await stop_warm_up(MagicMock(bot_data={}))
+
+
+@pytest.mark.parametrize("chat_id", [None, "42"])
+def test_main_warm_up_hooks(monkeypatch, chat_id):
+    """Test main() only registers the warm up hooks when a chat ID is set."""
+    from unittest.mock import MagicMock
+
+    from aoe2_telegram_bot import _bot
+
+    builder = MagicMock()
+    builder.token.return_value = builder
+    builder.post_init.return_value = builder
+    builder.post_stop.return_value = builder
+    for name in ("bootstrap", "load_cache", "init_audio_index", "register_handlers"):
+        monkeypatch.setattr(_bot, name, MagicMock())
+    monkeypatch.setattr(_bot.atexit, "register", MagicMock())
+    monkeypatch.setattr(_bot, "ApplicationBuilder", MagicMock(return_value=builder))
+    monkeypatch.setenv("TGB_TOKEN", "abc:123")
+    if chat_id is None:
+        monkeypatch.delenv("TGB_WARMUP_CHAT_ID", raising=False)
+    else:
+        monkeypatch.setenv("TGB_WARMUP_CHAT_ID", chat_id)
+
+    _bot.main()
+
+    builder.build.return_value.run_polling.assert_called_once()
+    if chat_id is None:
+        builder.post_init.assert_not_called()
+        builder.post_stop.assert_not_called()
+    else:
+        post_init = builder.post_init.call_args.args[0]
+        assert post_init.func is _bot.warm_up
+        assert post_init.keywords == {"chat_id": 42}
+        builder.post_stop.assert_called_once_with(_bot.stop_warm_up)
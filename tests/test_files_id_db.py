@@ -1,7 +1,10 @@
 """Tests for file ID database functionality."""
 
+import pytest
+
 from aoe2_telegram_bot._files import (
     clear_file_id_db,
+    compact_file_id_db,
     get_all_file_ids,
     get_file_id,
     load_cache,
@@ -46,6 +49,16 @@ def test_get_all_file_ids(tmp_path):
     assert all_ids["test2.wav"] == "id_2"
 
 
+def test_get_all_file_ids_is_read_only(tmp_path):
+    """Test the returned file IDs cannot be modified directly."""
+    all_ids = get_all_file_ids()
+    with pytest.raises(TypeError):
+        all_ids["test.wav"] = "id"
+
+    set_file_id(tmp_path / "test.wav", "id_1")
+    assert all_ids["test.wav"] == "id_1"
+
+
 def test_clear_file_id_db(tmp_path):
     """Test clearing the file ID database."""
     test_file = tmp_path / "test.wav"
@@ -58,6 +71,22 @@ def test_clear_file_id_db(tmp_path):
     assert get_file_id(test_file) is None
 
 
+def test_clear_file_id_db_truncates_file(tmp_path, monkeypatch):
+    """Test clearing the database empties the file on disk."""
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "cache.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+
+    set_file_id(tmp_path / "test.wav", "file_id_123")
+    clear_file_id_db()
+
+    assert cache_file.read_text() == ""
+    load_cache()
+    assert len(_files_id_cache) == 0
+
+
 def test_load_cache_empty_file(tmp_path, monkeypatch):
     """Test loading cache when file doesn't exist."""
     from aoe2_telegram_bot import _folders
@@ -78,7 +107,7 @@ def test_cache_persistence(tmp_path, monkeypatch):
     from aoe2_telegram_bot._files import _files_id_cache
 
     cache_file = tmp_path / "cache.json"
-    # Patch files_id_db in the _files_id_db module itself
+    # Patch files_id_db in the _files module, the single owner of the cache
     monkeypatch.setattr(_files, "files_id_db", cache_file)
 
     # Start with empty cache
@@ -122,3 +151,131 @@ def test_load_cache_with_corrupted_json(tmp_path, monkeypatch):
     # Cache should be empty after failing to load
     all_ids = get_all_file_ids()
     assert len(all_ids) == 0
+
+
+def test_set_file_id_appends_line(tmp_path, monkeypatch):
+    """Test that each new file ID is appended as a JSON line."""
+    from aoe2_telegram_bot import _files
+
+    cache_file = tmp_path / "cache.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+
+    set_file_id(tmp_path / "test1.wav", "id_1")
+    set_file_id(tmp_path / "test2.wav", "id_2")
+    set_file_id(tmp_path / "test1.wav", "id_3")
+
+    assert len(cache_file.read_text().splitlines()) == 3
+
+
+def test_load_cache_last_entry_wins(tmp_path, monkeypatch):
+    """Test that later lines override earlier ones and the file is compacted."""
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "cache.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+    cache_file.write_text(
+        '{"test1.wav": "id_1"}\n{"test2.wav": "id_2"}\n{"test1.wav": "id_3"}\n{"trunc'
+    )
+
+    _files_id_cache.clear()
+    load_cache()
+
+    assert get_all_file_ids() == {"test1.wav": "id_3", "test2.wav": "id_2"}
+    assert len(cache_file.read_text().splitlines()) == 1
+
+
+def test_load_cache_truncated_line_then_append(tmp_path, monkeypatch):
+    """Test a single interrupted line does not swallow the next appended entry."""
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "cache.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+    cache_file.write_bytes(b'{"b.wa')
+
+    _files_id_cache.clear()
+    load_cache()
+    assert cache_file.read_bytes() == b""
+
+    set_file_id(tmp_path / "c.wav", "id_c")
+
+    _files_id_cache.clear()
+    load_cache()
+    assert get_all_file_ids() == {"c.wav": "id_c"}
+
+
+def test_load_cache_migrates_legacy_json(tmp_path, monkeypatch):
+    """Test file IDs of the former JSON database are imported once."""
+    import json
+
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "files_id_db.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+    legacy_file = tmp_path / "files_id_db.json"
+    legacy_file.write_text(json.dumps({"test1.wav": "id_1"}, indent=2))
+
+    _files_id_cache.clear()
+    load_cache()
+
+    assert get_all_file_ids() == {"test1.wav": "id_1"}
+    assert len(cache_file.read_text().splitlines()) == 1
+
+    # The new database now takes precedence over the legacy one
+    legacy_file.write_text(json.dumps({"test1.wav": "stale"}))
+    _files_id_cache.clear()
+    load_cache()
+    assert get_all_file_ids() == {"test1.wav": "id_1"}
+
+
+def test_load_cache_corrupted_legacy_json(tmp_path, monkeypatch):
+    """Test a corrupted legacy database is ignored."""
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "files_id_db.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+    (tmp_path / "files_id_db.json").write_text("{invalid json")
+
+    _files_id_cache.clear()
+    load_cache()
+
+    assert len(get_all_file_ids()) == 0
+    assert not cache_file.exists()
+
+
+def test_compact_file_id_db(tmp_path, monkeypatch):
+    """Test compacting the database into a single line."""
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "cache.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+
+    set_file_id(tmp_path / "test1.wav", "id_1")
+    set_file_id(tmp_path / "test2.wav", "id_2")
+    compact_file_id_db()
+
+    assert len(cache_file.read_text().splitlines()) == 1
+
+    _files_id_cache.clear()
+    load_cache()
+    assert get_all_file_ids() == {"test1.wav": "id_1", "test2.wav": "id_2"}
+
+
+def test_cache_persistence_without_orjson(tmp_path, monkeypatch):
+    """Test that the standard json fallback reads and writes the same format."""
+    from aoe2_telegram_bot import _files
+    from aoe2_telegram_bot._files import _files_id_cache
+
+    cache_file = tmp_path / "cache.jsonl"
+    monkeypatch.setattr(_files, "files_id_db", cache_file)
+    monkeypatch.setattr(_files, "orjson", None)
+
+    set_file_id(tmp_path / "test.wav", "fallback_id")
+
+    _files_id_cache.clear()
+    load_cache()
+    assert get_file_id(tmp_path / "test.wav") == "fallback_id"
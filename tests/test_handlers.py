@@ -3,16 +3,27 @@
 import pytest
 
 from aoe2_telegram_bot._files import (
+    _audio_category,
     _get_random_file,
+    clear_audio_index,
+    get_civilization_by_name,
+    get_civilization_list,
     get_random_audio,
     get_random_civilization,
     get_random_taunt,
+    get_sound_list,
+    get_taunt_by_number,
+    get_taunt_list,
+    get_taunt_numbers,
     set_file_id,
 )
 from aoe2_telegram_bot._handlers import (
     civilization,
     help_command,
     list_civilizations,
+    list_sounds,
+    list_taunts,
+    register_handlers,
     send_audio,
     send_random_civilization,
     send_random_sound,
@@ -20,12 +31,13 @@ from aoe2_telegram_bot._handlers import (
     start,
     taunt,
     unknown_command,
+    warm_file_id_cache,
 )
 
 
 def test_get_random_file_from_filesystem(temp_audio_folder):
     """Test getting random file from filesystem when cache is empty."""
-    file_path, file_id = _get_random_file("*.wav")
+    file_path, file_id = _get_random_file("audio")
 
     assert file_path is not None
     assert file_path.suffix == ".wav"
@@ -33,20 +45,69 @@ def test_get_random_file_from_filesystem(temp_audio_folder):
     assert file_id is None
 
 
-def test_get_random_file_no_files(tmp_path, monkeypatch):
+def test_get_random_file_no_files(empty_audio_folder):
     """Test getting random file when no files exist."""
-    from aoe2_telegram_bot import _folders
-
-    empty_dir = tmp_path / "empty"
-    empty_dir.mkdir()
-    monkeypatch.setattr(_folders, "audio_folder", empty_dir)
-
-    file_path, file_id = _get_random_file("*.wav")
+    file_path, file_id = _get_random_file("audio")
 
     assert file_path is None
     assert file_id is None
 
 
+def test_init_audio_index(temp_audio_folder):
+    """Test audio files are indexed by category."""
+    assert sorted(get_sound_list()) == ["test1", "test2"]
+    assert sorted(get_taunt_list()) == ["01 taunt", "02 taunt"]
+    assert sorted(get_civilization_list()) == ["Britons", "Celts"]
+
+
+@pytest.mark.parametrize(
+    "name, category",
+    [
+        ("attack.wav", "audio"),
+        ("01 yes.mp3", "taunts"),
+        ("42 start the game already.mp3", "taunts"),
+        ("Britons.mp3", "civs"),
+        ("B.mp3", "civs"),
+        ("britons.mp3", None),
+        ("BritonS.mp3", None),
+        ("1 yes.mp3", None),
+        ("installation_complete", None),
+    ],
+)
+def test_audio_category(name, category):
+    """Test audio file names are classified like the documented naming scheme."""
+    assert _audio_category(name) == category
+
+
+def test_audio_index_is_built_once(temp_audio_folder):
+    """Test the audio folder is only scanned again after clearing the index."""
+    assert "test3" not in get_sound_list()
+    (temp_audio_folder / "test3.wav").write_text("fake audio 3")
+    assert "test3" not in get_sound_list()
+
+    clear_audio_index()
+    assert "test3" in get_sound_list()
+
+
+def test_get_taunt_by_number(temp_audio_folder):
+    """Test taunt lookup by number."""
+    assert get_taunt_by_number(1).name == "01 taunt.mp3"
+    assert get_taunt_by_number(2).name == "02 taunt.mp3"
+    assert get_taunt_by_number(99) is None
+
+
+def test_get_civilization_by_name(temp_audio_folder):
+    """Test civilization lookup is case insensitive."""
+    assert get_civilization_by_name("britons").name == "Britons.mp3"
+    assert get_civilization_by_name("CELTS").name == "Celts.mp3"
+    assert get_civilization_by_name("atlantis") is None
+
+
+def test_get_taunt_numbers(temp_audio_folder):
+    """Test taunt numbers are read from the index."""
+    assert get_taunt_numbers() == [1, 2]
+
+
 def test_get_random_audio(temp_audio_folder):
     """Test getting random audio quote."""
     file_path, file_id = get_random_audio()
@@ -95,6 +156,25 @@ async def test_send_audio_new_file(
     assert cached_id == "test_file_id_12345"
 
 
+@pytest.mark.asyncio
+async def test_send_audio_chat_action_failure(
+    temp_audio_folder, mock_update, mock_context, mock_audio_caption
+):
+    """Test a failing chat action does not prevent caching the sent audio."""
+    from telegram.error import TelegramError
+
+    from aoe2_telegram_bot._files import get_file_id
+
+    audio_file = temp_audio_folder / "test1.wav"
+    mock_context.bot.send_chat_action.side_effect = TelegramError("network error")
+
+    await send_audio(mock_update, mock_context, audio_file, None)
+
+    mock_context.bot.send_chat_action.assert_called_once()
+    mock_context.bot.send_audio.assert_called_once()
+    assert get_file_id(audio_file) == "test_file_id_12345"
+
+
 @pytest.mark.asyncio
 async def test_send_audio_cached_file_id(
     temp_audio_folder, mock_update, mock_context, mock_audio_caption
@@ -109,6 +189,8 @@ async def test_send_audio_cached_file_id(
     call_kwargs = mock_context.bot.send_audio.call_args.kwargs
     assert call_kwargs["audio"] == cached_id
     assert call_kwargs.get("title") is None  # No title for cached IDs
+    # Nothing is uploaded, no recording status
+    mock_context.bot.send_chat_action.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -127,6 +209,11 @@ async def test_send_audio_with_existing_cache(
     call_kwargs = mock_context.bot.send_audio.call_args.kwargs
     assert call_kwargs["audio"] == cached_id
 
+    # Should keep the existing cached ID
+    from aoe2_telegram_bot._files import get_file_id
+
+    assert get_file_id(audio_file) == cached_id
+
 
 @pytest.mark.asyncio
 async def test_send_audio_no_file_no_id(mock_update, mock_context, mock_audio_caption):
@@ -220,6 +307,7 @@ async def test_taunt_specific_number(
     # Create taunt file
     taunt_file = temp_audio_folder / "11 wololo.mp3"
     taunt_file.write_text("fake taunt")
+    clear_audio_index()
 
     await taunt(mock_update, mock_context)
 
@@ -227,6 +315,19 @@ async def test_taunt_specific_number(
     mock_context.bot.send_audio.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_taunt_with_bot_name_and_arguments(
+    temp_audio_folder, mock_update, mock_context, mock_audio_caption
+):
+    """Test taunt command addressed to the bot in a group with extra text."""
+    mock_update.message.text = "/2@aoe2_bot hello"
+
+    await taunt(mock_update, mock_context)
+
+    call_kwargs = mock_context.bot.send_audio.call_args.kwargs
+    assert call_kwargs["title"] == "02 taunt"
+
+
 @pytest.mark.asyncio
 async def test_taunt_not_found(temp_audio_folder, mock_update, mock_context):
     """Test taunt command when taunt doesn't exist."""
@@ -266,6 +367,19 @@ async def test_civilization_case_insensitive(
     mock_context.bot.send_audio.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_civilization_with_bot_name(
+    temp_audio_folder, mock_update, mock_context, mock_audio_caption
+):
+    """Test civilization command addressed to the bot in a group."""
+    mock_update.message.text = "/Celts@aoe2_bot"
+
+    await civilization(mock_update, mock_context)
+
+    call_kwargs = mock_context.bot.send_audio.call_args.kwargs
+    assert call_kwargs["title"] == "Celts"
+
+
 @pytest.mark.asyncio
 async def test_civilization_not_found(temp_audio_folder, mock_update, mock_context):
     """Test civilization command when civ doesn't exist."""
@@ -289,3 +403,81 @@ async def test_list_civilizations(temp_audio_folder, mock_update, mock_context):
     text = call_kwargs["text"]
     # Should contain civilization names with slashes
     assert "/britons" in text.lower() or "/celts" in text.lower()
+
+
+def test_register_handlers(temp_audio_folder):
+    """Test commands are registered for every indexed audio file."""
+    from unittest.mock import MagicMock
+
+    application = MagicMock()
+    register_handlers(application)
+
+    commands = set()
+    for call in application.add_handler.call_args_list:
+        commands |= getattr(call.args[0], "commands", set())
+
+    assert {"1", "2", "britons", "celts", "test1", "test2"} <= commands
+    assert {"sound", "bruitage", "help", "aide"} <= commands
+    # 9 static commands, taunts, civilizations, sounds and unknown commands
+    assert application.add_handler.call_count == 13
+
+
+@pytest.mark.asyncio
+async def test_list_taunts(temp_audio_folder, mock_update, mock_context):
+    """Test list taunts command."""
+    await list_taunts(mock_update, mock_context)
+
+    text = mock_context.bot.send_message.call_args.kwargs["text"]
+    assert text == "Available taunts:\n/01: taunt\n/02: taunt"
+
+
+@pytest.mark.asyncio
+async def test_list_sounds_empty(empty_audio_folder, mock_update, mock_context):
+    """Test list sounds command when no sounds are available."""
+    await list_sounds(mock_update, mock_context)
+
+    text = mock_context.bot.send_message.call_args.kwargs["text"]
+    assert text == "No sounds available."
+
+
+@pytest.mark.asyncio
+async def test_warm_file_id_cache(temp_audio_folder, mock_context):
+    """Test uploading only the audio files missing from the file ID cache."""
+    from aoe2_telegram_bot._files import get_all_file_ids
+
+    set_file_id(temp_audio_folder / "test1.wav", "already_cached")
+
+    await warm_file_id_cache(mock_context.bot, 42)
+
+    # 6 audio files, one of them already cached
+    assert mock_context.bot.send_audio.call_count == 5
+    assert mock_context.bot.send_audio.call_args.kwargs["chat_id"] == 42
+    all_ids = get_all_file_ids()
+    assert len(all_ids) == 6
+    assert all_ids["test1.wav"] == "already_cached"
+    assert all_ids["Celts.mp3"] == "test_file_id_12345"
+
+
+@pytest.mark.asyncio
+async def test_warm_file_id_cache_retry_after(temp_audio_folder, mock_context):
+    """Test flood control waits and retries the same file instead of skipping it."""
+    import warnings
+
+    from telegram.error import RetryAfter
+    from telegram.warnings import PTBDeprecationWarning
+
+    from aoe2_telegram_bot._files import get_all_file_ids
+
+    with warnings.catch_warnings():
+        # PTB itself reads retry_after when building the error
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        flood_control = RetryAfter(0)
+    message = mock_context.bot.send_audio.return_value
+    mock_context.bot.send_audio.side_effect = [flood_control] + [message] * 6
+
+    await warm_file_id_cache(mock_context.bot, 42)
+
+    assert mock_context.bot.send_audio.call_count == 7
+    first, retry = mock_context.bot.send_audio.call_args_list[:2]
+    assert first.kwargs["audio"] == retry.kwargs["audio"]
+    assert len(get_all_file_ids()) == 6